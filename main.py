@@ -1,23 +1,167 @@
 """Load page of URL, accept all cookies and take a screenshot"""
 
+import asyncio
 import logging
 import logging.handlers
-from datetime import datetime, timezone
+from datetime import datetime
 
 from zoneinfo import ZoneInfo
 from pathlib import Path
-from playwright.sync_api import sync_playwright
-import time
+from typing import Optional
+from playwright.async_api import (
+    async_playwright,
+    BrowserContext,
+    Page,
+    TimeoutError as PlaywrightTimeoutError,
+)
 from traffic_analysis import (
     load_config,
 )
 
 RUN_LOCAL = False  # Set to True when run locally
+FULL_SCREENSHOTS = False  # Set to True for unclipped shots to add measure points
 CONFIG_FILE = "config.toml"
+CONCURRENCY = 4  # Number of browser contexts taking screenshots in parallel
+MAP_SELECTOR = "canvas.widget-scene-canvas"  # Google Maps canvas with the tiles
+MAP_TIMEOUT = 8000  # Maximum time in ms to wait for the map to become visible
+TILE_SETTLE_TIME = 500  # Time in ms for the traffic layer colors to settle
+STORAGE_STATE = Path(".pw-state.json")  # Cookies kept between runs
+CLIP_MARGIN = 50  # Pixels kept around the measure points in the screenshots
+BRUSSELS = ZoneInfo("Europe/Brussels")  # Timezone of the screenshot timestamps
 assert Path(CONFIG_FILE).exists()
 
+logger = logging.getLogger(__name__)
+
+
+def screenshot_clip(street_config: dict) -> Optional[dict]:
+    """Region of the screenshot that contains all measure points of a street.
+
+    The region starts in the top left corner, so the coordinates of the
+    measure points stay valid. Streets without measure points are not
+    clipped, so the points can still be picked on the full screenshot.
+    To add measure points beyond the region, for example a new direction
+    for a street, set FULL_SCREENSHOTS to take unclipped screenshots.
+    The screenshots are kept as lossless PNG, because the traffic colors
+    are matched exactly.
+    """
+    points = [
+        point
+        for points_list in street_config.get("points", {}).values()
+        for point in points_list
+    ]
+    if not points:
+        return None
+    return {
+        "x": 0,
+        "y": 0,
+        "width": int(max(x for x, _ in points)) + CLIP_MARGIN,
+        "height": int(max(y for _, y in points)) + CLIP_MARGIN,
+    }
+
+
+async def wait_for_map(page: Page) -> None:
+    """Wait until the map is rendered instead of waiting for network idle.
+
+    Google Maps keeps polling for traffic updates, so "networkidle" only fires
+    long after the map is drawn.
+    """
+    await page.wait_for_load_state("domcontentloaded")
+    try:
+        await page.locator(MAP_SELECTOR).first.wait_for(
+            state="visible", timeout=MAP_TIMEOUT
+        )
+    except PlaywrightTimeoutError:
+        logger.warning(f"Map of {page.url} not visible after {MAP_TIMEOUT} ms.")
+    await page.wait_for_timeout(TILE_SETTLE_TIME)
+
+
+async def accept_cookies(page: Page, url: str) -> None:
+    """Open the first URL in a fresh context and accept the cookie banner."""
+    await page.goto(url)
+    # for i, el in enumerate(await page.get_by_label("Accept all").all()):
+    for i, el in enumerate(await page.get_by_label("Alles accepteren").all()):
+        try:
+            await el.click()
+        except Exception as e:
+            logging.debug(f"Clicked {i}th element: {str(e)}")
+    await wait_for_map(page)
+
+
+async def capture(
+    url: str, streetname: str, clip: Optional[dict], page: Page, dst: Path
+) -> None:
+    """Take a screenshot of url, clipped to clip, and store it in dst."""
+    await page.goto(url)
+    await wait_for_map(page)
+    timestr = datetime.now(BRUSSELS).strftime("%Y%m%d-%H%M%S")
+    shot_file = dst / f"leuven_{streetname}_{timestr}.png"
+    if clip is not None:
+        viewport = page.viewport_size
+        clip = {
+            **clip,
+            "width": min(clip["width"], viewport["width"]),
+            "height": min(clip["height"], viewport["height"]),
+        }
+    await page.screenshot(path=shot_file.as_posix(), clip=clip)
+    logger.info(f"Took shot {shot_file.as_posix()} on {timestr}.")
+
+
+async def capture_all(shots: list, pages: asyncio.Queue, dst: Path) -> None:
+    """Take all (url, streetname, clip) shots, spreading them over the pooled pages."""
+
+    async def capture_on_free_page(
+        url: str, streetname: str, clip: Optional[dict]
+    ) -> None:
+        page = await pages.get()
+        try:
+            await capture(url, streetname, clip, page, dst)
+        finally:
+            pages.put_nowait(page)
+
+    await asyncio.gather(
+        *[
+            capture_on_free_page(url, streetname, clip)
+            for url, streetname, clip in shots
+        ]
+    )
+
+
+async def main(shots: list, dst: Path) -> None:
+    async with async_playwright() as p:
+        browser_type = p.chromium
+        browser = await browser_type.launch(headless=True)
+        # Cookies accepted in an earlier run are loaded from the stored state.
+        storage_state = STORAGE_STATE.as_posix() if STORAGE_STATE.exists() else None
+        # One context per concurrent screenshot. Contexts share the browser
+        # process, so they are a lot cheaper than launching extra browsers.
+        contexts: list[BrowserContext] = [
+            await browser.new_context(locale="en-US", storage_state=storage_state)
+            for _ in range(min(CONCURRENCY, len(shots)))
+        ]
+        context_pages = [await context.new_page() for context in contexts]
+        if storage_state is None:
+            # Cookies are stored per context, so every context accepts them once.
+            await asyncio.gather(
+                *[accept_cookies(page, shots[0][0]) for page in context_pages]
+            )
+            await contexts[0].storage_state(path=STORAGE_STATE.as_posix())
+        # The queue hands out one free page per screenshot, limiting the
+        # number of concurrent screenshots to the number of contexts.
+        pages: asyncio.Queue = asyncio.Queue()
+        for page in context_pages:
+            pages.put_nowait(page)
+        if RUN_LOCAL:
+            while True:
+                await capture_all(shots, pages, dst)
+                await asyncio.sleep(300)
+        else:
+            await capture_all(shots, pages, dst)
+        for context in contexts:
+            await context.close()
+        await browser.close()
+
+
 if __name__ == "__main__":
-    logger = logging.getLogger(__name__)
     logger.setLevel(logging.DEBUG)
     logger_file_handler = logging.handlers.RotatingFileHandler(
         "status.log",
@@ -36,49 +180,15 @@ if __name__ == "__main__":
     dst = Path("./shots")  # Directory to store resulting png images in.
     dst.mkdir(exist_ok=True)
 
-    urls = []
-    for location_i in config.keys():
-        for street_i in config[location_i].keys():
-            urls.append(config[location_i][street_i]["url"])
-    streetnames = []
-    for location_i in config.keys():
-        for street_i in config[location_i].keys():
-            streetnames.append(street_i)
+    # The URL, street name and clip of every screenshot, in a single pass
+    shots = [
+        (
+            street_config["url"],
+            street_i,
+            None if FULL_SCREENSHOTS else screenshot_clip(street_config),
+        )
+        for streets in config.values()
+        for street_i, street_config in streets.items()
+    ]
 
-    with sync_playwright() as p:
-        browser_type = p.chromium
-        browser = browser_type.launch(headless=True)
-        context = browser.new_context(locale="en-US")
-        page = context.new_page()
-        page.goto(urls[0])
-        # for i, el in enumerate(page.get_by_label("Accept all").all()):
-        for i, el in enumerate(page.get_by_label("Alles accepteren").all()):
-            try:
-                el.click()
-            except Exception as e:
-                logging.debug(f"Clicked {i}th element: {str(e)}")
-        page.wait_for_load_state("networkidle")
-        if RUN_LOCAL:
-            while True:
-                for url, streetname in zip(urls, streetnames):
-                    page.goto(url)
-                    page.wait_for_load_state("networkidle")
-                    now_utc = datetime.now(timezone.utc)
-                    now_local = now_utc.astimezone(ZoneInfo("Europe/Brussels"))
-                    timestr = now_local.strftime("%Y%m%d-%H%M%S")
-                    shot_file = dst / f"leuven_{streetname}_{timestr}.png"
-                    page.screenshot(path=shot_file.as_posix())
-                    logger.info(f"Took shot {shot_file.as_posix()} on {timestr}.")
-                time.sleep(300)
-        else:
-            for url, streetname in zip(urls, streetnames):
-                page.goto(url)
-                page.wait_for_load_state("networkidle")
-                now_utc = datetime.now(timezone.utc)
-                now_local = now_utc.astimezone(ZoneInfo("Europe/Brussels"))
-                timestr = now_local.strftime("%Y%m%d-%H%M%S")
-                shot_file = dst / f"leuven_{streetname}_{timestr}.png"
-                page.screenshot(path=shot_file.as_posix())
-                logger.info(f"Took shot {shot_file.as_posix()} on {timestr}.")
-        context.close()
-        browser.close()
+    asyncio.run(main(shots, dst))
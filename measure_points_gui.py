@@ -3,7 +3,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import numpy as np
 import pprint
-import toml
+import tomllib
+import tomli_w
 import argparse
 import sys
 
@@ -25,17 +26,19 @@ point_list_name = args.point_list_name
 
 pp = pprint.PrettyPrinter(indent=4)
 
-# Open the TOML file
-with open("config.toml", "r") as f:
-    # Load the contents of the file into a dictionary
-    config = toml.load(f)
+# Read the whole TOML file at once and parse it into a dictionary
+config = tomllib.loads(Path("config.toml").read_bytes().decode("utf-8"))
 
 image_path = Path(local_file_path)
 assert image_path.exists()
 
 points = []
 
-img = cv2.imread(image_path.as_posix(), cv2.IMREAD_UNCHANGED)
+img = cv2.imread(image_path.as_posix(), cv2.IMREAD_COLOR)
+# The crosses are drawn on a separate overlay that is only combined with the
+# image when the window is redrawn.
+overlay = np.zeros_like(img)
+redraw = False
 
 location, street, time = image_path.stem.split("_")
 
@@ -44,6 +47,7 @@ print(f"{location=}, {street=}, {point_list_name=}")
 
 # Step 3: Create a mouse callback function
 def mouse_callback(event, x, y, flags, param):
+    global redraw
     if event == cv2.EVENT_LBUTTONDOWN:
         print("X: ", x, "Y: ", y)
         points.append([x, y])
@@ -53,7 +57,7 @@ def mouse_callback(event, x, y, flags, param):
 
         # Draw horizontal line of the cross
         cv2.line(
-            img,
+            overlay,
             (x - line_length, y - line_length),
             (x + line_length, y + line_length),
             (0, 0, 255),
@@ -62,13 +66,21 @@ def mouse_callback(event, x, y, flags, param):
 
         # Draw vertical line of the cross
         cv2.line(
-            img,
+            overlay,
             (x - line_length, y + line_length),
             (x + line_length, y - line_length),
             (0, 0, 255),
             thickness=1,
         )
-        cv2.imshow("image", img)
+        redraw = True
+
+
+def composite():
+    # Show the crosses of the overlay on top of the image
+    mask = overlay.any(axis=2)
+    shown = img.copy()
+    shown[mask] = overlay[mask]
+    return shown
 
 
 # Step 4: Create a window to display the image
@@ -80,9 +92,13 @@ cv2.setMouseCallback("image", mouse_callback)
 # Step 6: Display the image in the window
 cv2.imshow("image", img)
 
-# Step 7: Wait for a key event
+# Step 7: Wait for a key event and redraw once for all clicks since the last redraw
 while True:
-    if cv2.waitKey(0) & 0xFF == ord("q"):
+    if redraw:
+        redraw = False
+        cv2.imshow("image", composite())
+    # Poll at a fixed interval to let the window handle its events
+    if cv2.waitKey(50) & 0xFF == ord("q"):
         break
 
 print(f"points {point_list_name}= ", end="")
@@ -102,8 +118,8 @@ if point_list_name in config[location][street].keys():
 
 config[location][street][point_list_name] = points
 
-with open("config.toml", "w") as f:
+with open("config.toml", "wb") as f:
     # Write the dictionary to the file as TOML
-    toml.dump(config, f)
+    tomli_w.dump(config, f)
 # Step 8: Close all windows
 cv2.destroyAllWindows()
@@ -4,14 +4,40 @@ import matplotlib.pyplot as plt
 import matplotlib.axes._axes as axes
 from matplotlib.patheffects import Stroke, Normal
 import numpy as np
-import toml
-from datetime import datetime
+import tomllib
 import pandas as pd
 import re
-from typing import Union, Tuple, Dict, List
+from typing import Optional, Union, Tuple, Dict, List
 import os
 from pprint import pprint
 import math
+import copy
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+
+# Linear sRGB to XYZ conversion matrix
+_SRGB_TO_XYZ = np.array(
+    [
+        [0.4124, 0.3576, 0.1805],
+        [0.2126, 0.7152, 0.0722],
+        [0.0193, 0.1192, 0.9505],
+    ],
+    dtype=np.float32,
+)
+# Linear value of every 8-bit sRGB channel value, assuming sRGB
+_SRGB_LEVELS = np.arange(256) / 255.0
+_SRGB_TO_LINEAR = np.where(
+    _SRGB_LEVELS > 0.04045,
+    ((_SRGB_LEVELS + 0.055) / 1.055) ** 2.4,
+    _SRGB_LEVELS / 12.92,
+).astype(np.float32)
+# Observer=2°, Illuminant=D65
+_REFERENCE_WHITE = np.array([95.047, 100.000, 108.883], dtype=np.float32)
+# Integer numbers in a color string
+_NUMBER_RE = re.compile(r"\d+")
+# Screenshot file name without suffix: {location}_{street}_%Y%m%d-%H%M%S
+_SCREENSHOT_RE = re.compile(r"([^_]+)_([^_]+)_(\d{8}-\d{6})")
 
 
 def argument2path(argument: Union[str, os.PathLike]) -> os.PathLike:
@@ -49,6 +75,26 @@ def argument2path(argument: Union[str, os.PathLike]) -> os.PathLike:
     return argument_path
 
 
+def _normalize_config(config: dict) -> dict:
+    """Turn the lists of measure points in the configuration into (N, 2) intp arrays."""
+    for streets in config.values():
+        for street_config in streets.values():
+            points = street_config.get("points", {})
+            for list_name, points_list in points.items():
+                points[list_name] = np.asarray(points_list, dtype=np.intp).reshape(
+                    -1, 2
+                )
+    return config
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_toml(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse a TOML file, cached on its path, modification time and size."""
+    # Read the whole TOML file at once and parse it into a dictionary
+    data = Path(path).read_bytes()
+    return _normalize_config(tomllib.loads(data.decode("utf-8")))
+
+
 def load_config(tomlfile: Union[str, os.PathLike]) -> dict:
     """
     Load configuration settings from a TOML file and return them as a dictionary.
@@ -68,22 +114,45 @@ def load_config(tomlfile: Union[str, os.PathLike]) -> dict:
     Note:
         This function reads the contents of a TOML file and converts it into a dictionary
         of key-value pairs. It is useful for loading configuration settings from external files.
+        The lists of measure points are converted to NumPy intp arrays of shape (N, 2).
+        The parsed file is cached until its modification time or size changes. A copy is
+        returned so callers can modify the configuration without affecting the cache.
     """
     toml_path = argument2path(tomlfile)
+    st = toml_path.stat()
+    config = _parse_toml(str(toml_path), st.st_mtime_ns, st.st_size)
+    return copy.deepcopy(config)
 
-    # Open the TOML file
-    with open(toml_path, "r") as f:
-        # Load the contents of the file into a dictionary
-        config = toml.load(f)
-    return config
 
+def load_shot(url: Union[str, os.PathLike]) -> np.ndarray:
+    """
+    Load an image from a given URL or file path as an RGB array, without plotting it.
 
-def display_shot(url: Union[str, os.PathLike]) -> axes.Axes:
+    Args:
+        url (Union[str, os.PathLike]): A string or a path-like object representing the URL or file path of the image.
+
+    Returns:
+        np.ndarray: Contiguous uint8 array of shape (height, width, 3) with the RGB channels.
+
+    Example:
+        >>> load_shot("shots/leuven_tiensestraat_20231017-123929.png").shape
+        (720, 1280, 3)
+    """
+    image = argument2path(url)
+    return cv2.cvtColor(
+        cv2.imread(image.as_posix(), cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB
+    )
+
+
+def display_shot(
+    url: Union[str, os.PathLike], ax: Optional[axes.Axes] = None
+) -> axes.Axes:
     """
     Display an image from a given URL or file path using Matplotlib.
 
     Args:
         url (Union[str, os.PathLike]): A string or a path-like object representing the URL or file path of the image.
+        ax (Optional[matplotlib.axes.Axes]): Axes to draw the image on. A new figure is created when None.
 
     Returns:
         matplotlib.axes.Axes: Matplotlib Axes object displaying the image.
@@ -95,12 +164,22 @@ def display_shot(url: Union[str, os.PathLike]) -> axes.Axes:
     Note:
         This function takes a URL or file path, loads and displays the image using Matplotlib.
         It can be used to visualize images in Jupyter notebooks or other interactive environments.
+        When an Axes that already shows a screenshot is passed, only the image data (and the
+        extent, when the size differs) is replaced, so many screenshots can be browsed without creating a new figure each time.
     """
-    image = argument2path(url)
-    im = cv2.cvtColor(cv2.imread(image.as_posix()), cv2.COLOR_BGR2RGB)
-    fig, ax = plt.subplots(figsize=(10, 10))
-    ax.set_axis_off()
-    ax.imshow(im)
+    im = load_shot(url)
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 10))
+        ax.set_axis_off()
+    if ax.images:
+        image = ax.images[0]
+        if image.get_array().shape != im.shape:
+            # Screenshots are clipped per street, so fit the extent to the new size
+            height, width = im.shape[:2]
+            image.set_extent((-0.5, width - 0.5, height - 0.5, -0.5))
+        image.set_data(im)
+    else:
+        ax.imshow(im, interpolation="none")
     return ax
 
 
@@ -118,15 +197,13 @@ def show_points_on_screenshot(
     va_offset: str = "center",
 ) -> axes.Axes:
     # Read in the image on the URL
-    url_image = argument2path(url_image)
-    image_path = argument2path(url_image)
-    im = cv2.cvtColor(cv2.imread(image_path.as_posix()), cv2.COLOR_BGR2RGB)
+    im = load_shot(url_image)
     # Plot the point on the screenshot
     fig, ax = plt.subplots(figsize=(10, 10))
     ax.spines[:].set_visible(False)
     ax.yaxis.set_visible(False)
     ax.xaxis.set_visible(False)
-    ax.imshow(im)
+    ax.imshow(im, interpolation="none")
     for i, p in enumerate(config[location][street]["points"][points_list_name]):
         x, y = p[0], p[1]
         x_end, y_end = x - x_line_offset, y + y_line_offset
@@ -142,6 +219,33 @@ def show_points_on_screenshot(
     return ax
 
 
+def measure_point_plan(config: dict) -> Dict[Tuple[str, str, str], np.ndarray]:
+    """
+    Flatten the measurement points in the configuration into a single dictionary.
+
+    Args:
+        config (Dict[str, Dict[str, dict]]): A dictionary containing configuration information with nested structure.
+
+    Returns:
+        Dict[Tuple[str, str, str], np.ndarray]: A dictionary mapping (location, street, points list name)
+                                                to an array of shape (number of points, 2) with the x, y
+                                                coordinates of the points.
+
+    Example:
+        >>> config = {'Location1': {'StreetA': {'points': {'to': [(1, 2), (3, 4)]}}}}
+        >>> measure_point_plan(config)
+        {('Location1', 'StreetA', 'to'): array([[1, 2],
+               [3, 4]])}
+    """
+    return {
+        (location, street, list_name): np.asarray(points, dtype=np.intp).reshape(-1, 2)
+        for location in config
+        for street in config[location]
+        if "points" in config[location][street]
+        for list_name, points in config[location][street]["points"].items()
+    }
+
+
 def maximum_measure_points(config: dict) -> Tuple[int, str, str, str]:
     """
     Find the location and street with the maximum number of measurement points in the given configuration.
@@ -178,24 +282,123 @@ def maximum_measure_points(config: dict) -> Tuple[int, str, str, str]:
         3 Location1 StreetB
 
     Note:
-        This function iterates through the nested structure of the configuration dictionary
+        This function takes the maximum over all measure point lists of the configuration
         to find the location and street with the maximum number of measurement points.
         It returns a tuple containing the maximum points, location, and street names.
     """
-    max_points = 0
-    max_location = ""
-    max_street = ""
-    max_direction = ""
-    for location in config.keys():
-        for street in config[location].keys():
-            for points in config[location][street]["points"].keys():
-                number_of_points = len(config[location][street]["points"][points])
-                if number_of_points > max_points:
-                    max_points = number_of_points
-                    max_location = location
-                    max_street = street
-                    max_list_name = points
-    return max_points, max_location, max_street, max_list_name
+    (max_location, max_street, max_list_name), max_points = max(
+        measure_point_plan(config).items(),
+        key=lambda item: len(item[1]),
+        default=(("", "", ""), ()),
+    )
+    return len(max_points), max_location, max_street, max_list_name
+
+
+def pack_rgb(colors: np.ndarray) -> np.ndarray:
+    """
+    Pack an array of 8-bit color triples into one 32-bit integer per color.
+
+    Args:
+        colors (np.ndarray): Array of shape (..., 3) with 8-bit color channels.
+
+    Returns:
+        np.ndarray: Array of shape (...) with the channels packed as 0x00RRGGBB.
+
+    Example:
+        >>> pack_rgb(np.array([[242, 60, 50]], dtype=np.uint8))
+        array([15875122], dtype=uint32)
+    """
+    colors = colors.astype(np.uint32)
+    return (colors[..., 0] << 16) | (colors[..., 1] << 8) | colors[..., 2]
+
+
+@functools.lru_cache(maxsize=8)
+def _scan_screenshots(
+    url_image_dir: str, mtime_ns: int
+) -> Dict[Tuple[str, str], Tuple[List[Path], np.ndarray]]:
+    """Index the screenshots in a directory, cached on its path and modification time."""
+    keys = []
+    paths = []
+    timestrs = []
+    # os.scandir lists the directory in C, only matching screenshots become a Path
+    with os.scandir(url_image_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".png"):
+                continue
+            match = _SCREENSHOT_RE.fullmatch(entry.name[: -len(".png")])
+            if match:
+                keys.append((match[1], match[2]))
+                paths.append(Path(entry.path))
+                timestrs.append(match[3])
+    # Parse all timestamps at once with the vectorized pandas parser and keep
+    # them as a datetime64 array instead of one Timestamp object per file
+    timestamps = pd.to_datetime(timestrs, format="%Y%m%d-%H%M%S").values.astype(
+        "datetime64[s]"
+    )
+    positions = defaultdict(list)
+    for i, key in enumerate(keys):
+        positions[key].append(i)
+    index = {}
+    for key, street_positions in positions.items():
+        street_timestamps = timestamps[street_positions]
+        # The index is shared between callers
+        street_timestamps.flags.writeable = False
+        index[key] = ([paths[i] for i in street_positions], street_timestamps)
+    return index
+
+
+def index_screenshots(
+    url_image_dir: Union[str, os.PathLike],
+) -> Dict[Tuple[str, str], Tuple[List[Path], np.ndarray]]:
+    """
+    Index the screenshots in a directory by location and street.
+
+    Args:
+        url_image_dir (Union[str, os.PathLike]): Path to the directory containing screenshot images.
+
+    Returns:
+        Dict[Tuple[str, str], Tuple[List[Path], np.ndarray]]: A dictionary mapping (location, street) to the
+                                                              list of screenshot paths and a datetime64[s]
+                                                              array with their timestamps.
+
+    Example:
+        >>> index = index_screenshots("shots")
+        >>> sorted(index)
+        [('leuven', 'geldenaaksevest'), ('leuven', 'tiensesteenweg'), ('leuven', 'tiensestraat'), ('leuven', 'tiensevest')]
+
+    Note:
+        The directory is scanned once and the index is cached until the modification time of the
+        directory changes, for example when a screenshot is added. The returned index is shared
+        between callers and must not be modified.
+    """
+    url_image_dir = argument2path(url_image_dir)
+    return _scan_screenshots(str(url_image_dir), url_image_dir.stat().st_mtime_ns)
+
+
+def _process_image(path: Path, points: np.ndarray) -> np.ndarray:
+    """Read the RGB colors at points of a screenshot."""
+    return _sample_screenshot(
+        path.as_posix(), path.stat().st_mtime_ns, points.tobytes()
+    )
+
+
+@functools.lru_cache(maxsize=65536)
+def _sample_screenshot(path: str, mtime_ns: int, points_bytes: bytes) -> np.ndarray:
+    """Sample a screenshot, cached on its path, modification time and points.
+
+    The cache lives in memory, so it only speeds up repeated calls in the same
+    process, such as re-running notebook cells. Every new run decodes again.
+    """
+    points = np.frombuffer(points_bytes, dtype=np.intp).reshape(-1, 2)
+    # Decode without alpha channel
+    buffer = np.frombuffer(Path(path).read_bytes(), np.uint8)
+    screenshot = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    # Sample all points at once, shape (number of points, 3). Only the sampled
+    # pixels are converted from BGR to RGB instead of the whole image.
+    samples = np.ascontiguousarray(screenshot[points[:, 1], points[:, 0], ::-1])
+    # The samples are shared by all callers through the cache
+    samples.flags.writeable = False
+    return samples
 
 
 def get_colors_from_screenshots(
@@ -204,6 +407,7 @@ def get_colors_from_screenshots(
     location: str,
     street: str,
     points_list_name: str,
+    number_of_points: Optional[int] = None,
 ) -> pd.DataFrame:
     """
     Extract color information from screenshots based on the provided configuration.
@@ -212,6 +416,9 @@ def get_colors_from_screenshots(
         config (dict): Configuration dictionary containing information about locations, streets, and points.
         url_image_dir (Union[str, os.PathLike]): Path to the directory containing screenshot images.
         points_list_name (str): Name of the list of points to be sampled.
+        number_of_points (Optional[int]): Number of point columns in the DataFrame. Defaults to the
+                                          maximum number of measure points in the configuration.
+                                          Must be at least the number of points in the list.
 
     Returns:
         pd.DataFrame: DataFrame containing extracted color data with columns including location, street, path,
@@ -244,53 +451,112 @@ def get_colors_from_screenshots(
         This function processes screenshots of traffic data based on the provided configuration.
         It extracts color information from the images, maps the colors to traffic colors,
         and returns the data in a DataFrame for further analysis and visualization.
+
+    Raises:
+        ValueError: If number_of_points is smaller than the number of points in the list.
     """
     url_image_dir = argument2path(url_image_dir)
-    rows = []
-    number_of_points, _, _, _ = maximum_measure_points(config)
+    plan = measure_point_plan(config)
+    if number_of_points is None:
+        number_of_points = max(len(points) for points in plan.values())
     color_map = {
-        "[129  31  31]": "darkred",
-        "[242  60  50]": "red",
-        "[255 151  77]": "orange",
-        "[99 214 104]": "green",
+        (129, 31, 31): "darkred",
+        (242, 60, 50): "red",
+        (255, 151, 77): "orange",
+        (99, 214, 104): "green",
+    }
+    # Packed palette for the lookups
+    palette_u32 = pack_rgb(np.array(list(color_map.keys()), dtype=np.uint8))
+    # Colors that are not exactly one of the traffic colors become grey
+    categories = [*color_map.values(), "grey"]
+    points = plan[(location, street, points_list_name)]
+    if number_of_points < len(points):
+        raise ValueError(
+            f"number_of_points={number_of_points} is smaller than the {len(points)} points "
+            f"in {location}.{street}.{points_list_name}"
+        )
+    paths, timestamps = index_screenshots(url_image_dir).get(
+        (location, street), ([], np.array([], dtype="datetime64[s]"))
+    )
+    # Decode the screenshots and extract the colors at the point locations in
+    # parallel threads. OpenCV releases the GIL while decoding, so the threads
+    # run in parallel without the cost of pickling to worker processes.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        samples = list(executor.map(_process_image, paths, [points] * len(paths)))
+    # Collect the RGB colors of all screenshots in one array, unused points stay grey
+    rgb = np.full((len(paths), number_of_points, 3), 128, dtype=np.uint8)
+    for row_i, sampled in enumerate(samples):
+        rgb[row_i, : len(points)] = sampled
+    # The palette has only a few colors, so compare against all of them and
+    # keep the index of the matching color as category code.
+    matches = pack_rgb(rgb)[..., None] == palette_u32
+    traffic_codes = np.where(
+        matches.any(axis=-1), matches.argmax(axis=-1), len(categories) - 1
+    ).astype(np.int8)
+
+    # Create a dataframe from the columns of detected colors. The repeated
+    # strings are stored as categoricals, a small integer code per row.
+    single_code = np.zeros(len(paths), dtype=np.int8)
+    columns = {
+        "location": pd.Categorical.from_codes(single_code, categories=[location]),
+        "street": pd.Categorical.from_codes(single_code, categories=[street]),
+        "path": paths,
+        "timestamp": timestamps,
     }
-    # Loop over all screenshots and extract color at the point locations
-    for p in url_image_dir.glob(f"{location}_{street}_*.png"):
-        timestamp = datetime.strptime(p.stem, f"{location}_{street}_%Y%m%d-%H%M%S")
-        screenshot = cv2.cvtColor(cv2.imread(p.as_posix()), cv2.COLOR_BGR2RGB)
-        colors = ()
-        for idx, point in enumerate(
-            config[location][street]["points"][points_list_name]
-        ):
-            color = screenshot[point[1], point[0]]
-            colors += (color, color[0], color[1], color[2])
-            color_array_as_string = str(color)
-            colors += (color_array_as_string,)
-        # Fill the rest of the columns with grey color
-        for _ in range(idx + 1, number_of_points):
-            colors += ([128, 128, 128], 128, 128, 128, "[128 128 128]")
-        row = (location, street, p, timestamp) + colors
-        rows.append(row)
-
-    # Create a dataframe from the list of detected colors
-    all_columns = ["location", "street", "path", "timestamp"]
-
     for i in range(number_of_points):
-        all_columns.extend(
-            (
-                f"color_{i}",
-                f"p{i}_red",
-                f"p{i}_green",
-                f"p{i}_blue",
-                f"traffic_color_{i}",
-            )
+        columns[f"p{i}_red"] = rgb[:, i, 0]
+        columns[f"p{i}_green"] = rgb[:, i, 1]
+        columns[f"p{i}_blue"] = rgb[:, i, 2]
+        columns[f"traffic_color_{i}"] = pd.Categorical.from_codes(
+            traffic_codes[:, i], categories=categories
         )
 
-    df = pd.DataFrame(rows, columns=all_columns).sort_values(by="timestamp")
+    df = pd.DataFrame(columns).iloc[np.argsort(timestamps)]
 
     return df
 
 
+def write_colors_to_parquet(
+    df: pd.DataFrame, parquet_file: Union[str, os.PathLike]
+) -> None:
+    """
+    Write the colors extracted from screenshots to a compact, typed Parquet file.
+
+    Args:
+        df (pd.DataFrame): DataFrame returned by get_colors_from_screenshots.
+        parquet_file (Union[str, os.PathLike]): Path of the Parquet file to write.
+
+    Example:
+        >>> df = get_colors_from_screenshots(config, "shots", "leuven", "tiensestraat", "to")
+        >>> write_colors_to_parquet(df, "colors.parquet")
+        >>> pd.read_parquet("colors.parquet").shape
+        (39, 140)
+
+    Note:
+        The color channels are stored as uint8 columns and the location, street and traffic colors
+        are dictionary encoded, so each of them takes only a few bits per row.
+    """
+    # Only needed here, so scripts that just load the config do not need pyarrow
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    number_of_points = len(df.filter(regex=r"^p\d+_red$").columns)
+    columns = {
+        # Categoricals convert straight to dictionary encoded arrays
+        "location": pa.array(df["location"]),
+        "street": pa.array(df["street"]),
+        "path": pa.array(df["path"].astype(str)),
+        "timestamp": pa.array(df["timestamp"]),
+    }
+    for i in range(number_of_points):
+        for channel in ("red", "green", "blue"):
+            column = f"p{i}_{channel}"
+            columns[column] = pa.array(df[column].to_numpy(), type=pa.uint8())
+        column = f"traffic_color_{i}"
+        columns[column] = pa.array(df[column])
+    pq.write_table(pa.table(columns), parquet_file, compression="zstd")
+
+
 def rgb_to_xyz(r, g, b):
     # Convert RGB to [0, 1] range
     r, g, b = r / 255.0, g / 255.0, b / 255.0
@@ -325,47 +591,126 @@ def xyz_to_lab(x, y, z):
     return l, a, b
 
 
+@functools.lru_cache(maxsize=4096)
 def rgb_to_lab(r, g, b):
     x, y, z = rgb_to_xyz(r, g, b)
     return xyz_to_lab(x, y, z)
 
 
+def rgb_to_lab_vec(rgb: np.ndarray) -> np.ndarray:
+    """
+    Convert an array of RGB colors to CIELAB in one vectorized pass.
+
+    Args:
+        rgb (np.ndarray): Array of shape (..., 3) with RGB values in the range [0, 255]. Integer arrays
+                          must hold 8-bit values, they are decoded with a lookup table.
+
+    Returns:
+        np.ndarray: A float32 array of shape (..., 3) with the L, a and b values of the colors.
+
+    Example:
+        >>> rgb_to_lab_vec(np.array([[255, 0, 0], [128, 128, 128]])).shape
+        (2, 3)
+
+    Note:
+        This is the vectorized counterpart of rgb_to_lab and uses the same constants.
+    """
+    rgb = np.asarray(rgb)
+
+    # Assuming sRGB
+    if np.issubdtype(rgb.dtype, np.integer):
+        # 8-bit channels are decoded with a lookup in the precomputed table
+        linear = _SRGB_TO_LINEAR[rgb]
+    else:
+        rgb = rgb.astype(np.float32) / 255.0
+        linear = np.where(
+            rgb > 0.04045, np.power((rgb + 0.055) / 1.055, 2.4), rgb / 12.92
+        )
+
+    # Convert to XYZ, normalized by the reference white
+    xyz = np.einsum("...j,ij->...i", linear, _SRGB_TO_XYZ) / _REFERENCE_WHITE
+
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), (7.787 * xyz) + (16 / 116))
+
+    l = (116 * f[..., 1]) - 16
+    a = 500 * (f[..., 0] - f[..., 1])
+    b = 200 * (f[..., 1] - f[..., 2])
+
+    return np.stack((l, a, b), axis=-1).astype(np.float32)
+
+
+def _sqdist(
+    color1: Tuple[float, float, float], color2: Tuple[float, float, float]
+) -> float:
+    # Squared Euclidean distance between two colors, unrolled for the 3 color
+    # components to avoid the generator overhead
+    d0 = color1[0] - color2[0]
+    d1 = color1[1] - color2[1]
+    d2 = color1[2] - color2[2]
+    return d0 * d0 + d1 * d1 + d2 * d2
+
+
 def euclidean_distance(
     color1: Tuple[float, float, float], color2: Tuple[float, float, float]
 ) -> float:
     # Function to calculate Euclidean distance between two vectors
-    return math.sqrt(sum((c1 - c2) ** 2 for c1, c2 in zip(color1, color2)))
+    return math.sqrt(_sqdist(color1, color2))
 
 
-def map_color(
-    color: str, cielab_target_colors: Dict[str, Tuple[float, float, float]]
-) -> Tuple[str, float]:
+def parse_rgb(color: Union[str, Tuple[int, int, int]]) -> Tuple[int, int, int]:
     """
-    Maps an RGB color to the closest color in CIELAB space from a given set of target colors.
+    Get the RGB values of a color given as a string or as an (r, g, b) tuple.
 
     Args:
-    color (str): The RGB color to be mapped, in the format 'rgb(r, g, b)'.
-    cielab_target_colors (dict): A dictionary where keys are color names and values are colors in CIELAB space.
+        color (Union[str, Tuple[int, int, int]]): The color as a string containing 3 integer numbers,
+                                                  e.g. '[242  60  50]', or as an (r, g, b) tuple.
 
     Returns:
-    Tuple[str, float]: The name of the closest color from the target set and the Euclidean distance to it in CIELAB space.
+        Tuple[int, int, int]: The red, green and blue values of the color.
+
+    Example:
+        >>> parse_rgb("[242  60  50]")
+        (242, 60, 50)
     """
+    if not isinstance(color, str):
+        # Already parsed, no need to format and parse the numbers again
+        r, g, b = color
+        return int(r), int(g), int(b)
+
     # Extract RGB values from the input string
-    numbers = re.findall(r"\d+", color)
+    numbers = _NUMBER_RE.findall(color)
     assert (
         len(numbers) == 3
     ), f"Input {color} string has {len(numbers)} numbers: {numbers=}. Expected 3"
 
     # Convert string numbers to integers
     r, g, b = [int(num) for num in numbers]
+    return r, g, b
+
+
+def map_color(
+    color: Union[str, Tuple[int, int, int]],
+    cielab_target_colors: Dict[str, Tuple[float, float, float]],
+) -> Tuple[str, float]:
+    """
+    Maps an RGB color to the closest color in CIELAB space from a given set of target colors.
+
+    Args:
+    color (Union[str, Tuple[int, int, int]]): The RGB color to be mapped, in the format 'rgb(r, g, b)' or as an (r, g, b) tuple.
+    cielab_target_colors (dict): A dictionary where keys are color names and values are colors in CIELAB space.
+
+    Returns:
+    Tuple[str, float]: The name of the closest color from the target set and the Euclidean distance to it in CIELAB space.
+    """
+    r, g, b = parse_rgb(color)
 
     # Convert RGB to CIELAB
     cielab_color = rgb_to_lab(r, g, b)
 
-    # Find the closest color
+    # Find the closest color, the square root does not change which one is closest
     closest_color = min(
         cielab_target_colors,
-        key=lambda named_color: euclidean_distance(
+        key=lambda named_color: _sqdist(
             cielab_color, cielab_target_colors[named_color]
         ),
     )
@@ -378,21 +723,23 @@ def map_color(
     return closest_color, cielab_euclid_distance
 
 
-def map_colors(unique_colors: List[str]) -> Dict[str, str]:
+def map_colors(
+    unique_colors: List[Union[str, Tuple[int, int, int]]],
+) -> Dict[Union[str, Tuple[int, int, int]], str]:
     """
-    Maps each color in a list of unique RGB color strings to the closest color from a predefined set of target colors.
+    Maps each color in a list of unique RGB colors to the closest color from a predefined set of target colors.
 
     The mapping is done based on the CIELAB color space. The function converts the target colors and the input colors to CIELAB space and then finds the closest target color for each input color.
 
     Args:
-        unique_colors (List[str]): A list of color strings in the RGB format in string format.
-        Each string must contain 3 integer numbers.
+        unique_colors (List[Union[str, Tuple[int, int, int]]]): A list of colors, either as strings in the RGB
+        format that contain 3 integer numbers, or as (r, g, b) tuples of integers.
 
     Returns:
-        Dict[str, str]: A dictionary mapping each color in `unique_colors` to the name of the closest color from the predefined set.
+        Dict[Union[str, Tuple[int, int, int]], str]: A dictionary mapping each color in `unique_colors` to the name of the closest color from the predefined set.
 
     Note:
-        The function assumes the input RGB colors are in string format and need to be parsed.
+        Colors given as strings are parsed, (r, g, b) tuples are used as they are.
         The target colors are predefined within the function in RGB.
     """
     # Predefined target colors in RGB
@@ -405,14 +752,22 @@ def map_colors(unique_colors: List[str]) -> Dict[str, str]:
     }
 
     # Convert target colors to CIELAB
-    cielab_target_colors = {
-        color_name: rgb_to_lab(*rgb_values)
-        for color_name, rgb_values in target_colors.items()
-    }
-
-    # Map each unique color to the closest target color
+    target_names = list(target_colors)
+    cielab_target_colors = rgb_to_lab_vec(np.array(list(target_colors.values())))
+
+    # Extract the RGB values of all colors and convert them to CIELAB at once
+    unique_colors = list(unique_colors)
+    rgb_values = [parse_rgb(color) for color in unique_colors]
+    cielab_colors = rgb_to_lab_vec(np.array(rgb_values).reshape(-1, 3))
+
+    # Map each unique color to the closest target color, using the squared
+    # distances between all colors and all target colors at once
+    distances = (
+        (cielab_colors[:, None, :] - cielab_target_colors[None, :, :]) ** 2
+    ).sum(axis=2)
     mapped_colors = {
-        color: map_color(color, cielab_target_colors)[0] for color in unique_colors
+        color: target_names[closest]
+        for color, closest in zip(unique_colors, distances.argmin(axis=1))
     }
 
     return mapped_colors